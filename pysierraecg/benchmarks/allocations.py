@@ -0,0 +1,101 @@
+"""Compare allocations and GC pressure of `read_file` against a reused `SierraReader`.
+
+`read_file` builds fresh decoder tables and scratch buffers for every file, while a reused
+`SierraReader` keeps them between files. For each mode this reports throughput, the number of
+garbage collections and the time spent in them, and the peak traced memory.
+
+Usage:
+
+    python benchmarks/allocations.py path/to/corpus --limit 200
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from sierraecg import SierraEcgFile, SierraReader, read_file
+from sierraecg.cli import find_files
+
+
+class GcMonitor:
+    """Counts garbage collections and the time spent in them"""
+
+    collections: List[int]
+    pause: float = 0
+    started: float = 0
+
+    def __init__(self) -> None:
+        self.collections = [0, 0, 0]
+
+    def __call__(self, phase: str, info: Dict[str, int]) -> None:
+        if phase == "start":
+            self.started = time.perf_counter()
+        else:
+            self.collections[info["generation"]] += 1
+            self.pause += time.perf_counter() - self.started
+
+
+def measure(
+    name: str,
+    read: Callable[[str], SierraEcgFile],
+    filenames: List[str],
+    trace: bool,
+) -> None:
+    monitor = GcMonitor()
+    gc.collect()
+    gc.callbacks.append(monitor)
+    if trace:
+        tracemalloc.start()
+
+    start = time.perf_counter()
+    for filename in filenames:
+        read(filename)
+    elapsed = time.perf_counter() - start
+
+    peak = 0
+    if trace:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    gc.callbacks.remove(monitor)
+
+    gen0, gen1, gen2 = monitor.collections
+    print(f"{name}:")
+    print(f"  throughput:  {len(filenames) / elapsed:.1f} files/sec")
+    print(f"  collections: gen0={gen0} gen1={gen1} gen2={gen2} ({monitor.pause * 1000:.1f} ms)")
+    if trace:
+        print(f"  peak traced: {peak / 1e6:.2f} MB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare read_file with a reused SierraReader")
+    parser.add_argument("paths", nargs="+", help="corpus directories, files or glob patterns")
+    parser.add_argument("--include-repbeats", action="store_true", help="read repbeats too")
+    parser.add_argument("--limit", type=int, default=None, help="read at most this many files")
+    parser.add_argument(
+        "--trace", action="store_true", help="trace peak memory (slows both modes down)"
+    )
+    args = parser.parse_args()
+
+    filenames = find_files(args.paths)[: args.limit]
+    if len(filenames) == 0:
+        parser.error("no .xml files found")
+
+    reader = SierraReader()
+    measure(
+        "read_file",
+        lambda filename: read_file(filename, include_repbeats=args.include_repbeats),
+        filenames,
+        args.trace,
+    )
+    measure(
+        "SierraReader",
+        lambda filename: reader.read_file(filename, include_repbeats=args.include_repbeats),
+        filenames,
+        args.trace,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""Generate a reproducible corpus of synthetic Philips Sierra ECG files.
+
+The corpus cycles through every document version accepted by `assert_version`, 12 and 16
+channel acquisitions, each lead labeling path (`leadlabels`, STD-12, 10-WIRE and unknown
+acquisition types) and both representative beat layouts, so that a soak test over the corpus
+exercises every branch of `read_file`. The same `--seed` always produces the same files.
+
+Usage:
+
+    python benchmarks/corpus.py path/to/corpus --count 100000 --jobs 8
+"""
+
+import argparse
+from base64 import encodebytes
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+import os
+from typing import List, NamedTuple, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from sierraecg.xli import xli_encode
+
+DOCUMENT_TYPES = {
+    "1.03": "SierraECG",
+    "1.04": "PhilipsECG",
+    "1.04.01": "PhilipsECG",
+    "1.04.02": "PhilipsECG",
+}
+
+STANDARD_LABELS = ["I", "II", "III", "aVR", "aVL", "aVF", "V1", "V2", "V3", "V4", "V5", "V6"]
+EXTENDED_LABELS = STANDARD_LABELS + ["V3R", "V4R", "V5R", "V7"]
+
+SAMPLING_FREQ = 500
+DURATION = 11000
+SAMPLE_COUNT = int(DURATION * (SAMPLING_FREQ / 1000))
+RESOLUTION = 5
+
+REPBEAT_SAMPLE_COUNT = 1200
+
+# Lead vectors projecting the synthetic (X, Y, Z) heart vector onto each recorded channel.
+LEAD_VECTORS = {
+    "I": (1.0, 0.0, 0.0),
+    "II": (0.5, 0.87, 0.0),
+    "V1": (-0.3, 0.1, -0.9),
+    "V2": (0.0, 0.2, -1.0),
+    "V3": (0.4, 0.3, -0.7),
+    "V4": (0.8, 0.4, -0.3),
+    "V5": (0.9, 0.3, 0.1),
+    "V6": (0.9, 0.2, 0.3),
+    "V3R": (-0.6, 0.2, -0.6),
+    "V4R": (-0.8, 0.2, -0.4),
+    "V5R": (-0.9, 0.2, -0.2),
+    "V7": (0.6, 0.1, 0.7),
+}
+
+# (offset from the R peak in seconds, width in seconds, amplitude in mV) for P, Q, R, S and T.
+WAVES = [
+    (-0.18, 0.025, 0.15),
+    (-0.03, 0.010, -0.10),
+    (0.0, 0.012, 1.20),
+    (0.03, 0.010, -0.30),
+    (0.28, 0.060, 0.35),
+]
+
+
+class CorpusVariant(NamedTuple):
+    """Describes the shape of one synthetic file"""
+
+    doc_ver: str
+    channels: int
+    acquisition_type: str
+    use_lead_labels: bool
+    include_repbeats: bool
+
+
+def get_variants() -> List[CorpusVariant]:
+    variants: List[CorpusVariant] = []
+    for doc_ver, channels, include_repbeats in product(DOCUMENT_TYPES, [12, 16], [False, True]):
+        if doc_ver == "1.03":
+            # 1.03 files carry no lead labels, so the reader derives them from the acquisition
+            for acquisition_type in ["STD-12", "10-WIRE", "EASI"]:
+                variants.append(
+                    CorpusVariant(doc_ver, channels, acquisition_type, False, include_repbeats)
+                )
+        else:
+            variants.append(CorpusVariant(doc_ver, channels, "10-WIRE", True, include_repbeats))
+    return variants
+
+
+def get_file_name(index: int, variant: CorpusVariant) -> str:
+    labeling = "leadlabels" if variant.use_lead_labels else variant.acquisition_type
+    repbeats = "_repbeats" if variant.include_repbeats else ""
+    return os.path.join(
+        f"{index // 1000:04d}",
+        f"{index:07d}_{variant.doc_ver}_{variant.channels}ch_{labeling}{repbeats}.xml",
+    )
+
+
+def synthesize_heart_vector(
+    rng: np.random.Generator, t: npt.NDArray[np.float64], beats: npt.NDArray[np.float64]
+) -> npt.NDArray[np.float64]:
+    """Returns the (X, Y, Z) heart vector in mV sampled at times `t`"""
+    axis = rng.normal([1.0, 1.0, 0.8], 0.15)
+    signal = np.zeros((3, len(t)))
+    for offset, width, amplitude in WAVES:
+        shape = np.exp(-0.5 * ((t[None, :] - beats[:, None] - offset) / width) ** 2).sum(axis=0)
+        signal += (axis * amplitude * rng.uniform(0.8, 1.2))[:, None] * shape[None, :]
+    return signal
+
+
+def project_leads(
+    heart: npt.NDArray[np.float64], labels: List[str], scale: float
+) -> List[npt.NDArray[np.int32]]:
+    leads: List[npt.NDArray[np.int32]] = []
+    for index, label in enumerate(labels):
+        # Unknown acquisitions get generic channels, reuse the standard vectors for them
+        vector = LEAD_VECTORS.get(label, list(LEAD_VECTORS.values())[index % len(LEAD_VECTORS)])
+        leads.append(np.rint(np.dot(vector, heart) * scale).astype(np.int32))
+    return leads
+
+
+def create_leads(rng: np.random.Generator, channels: int) -> List[npt.NDArray[np.int16]]:
+    t = np.arange(SAMPLE_COUNT) / SAMPLING_FREQ
+    rr = 60.0 / rng.uniform(50, 110)
+    beats = np.arange(rng.uniform(0.2, 0.2 + rr), t[-1] + rr, rr)
+    heart = synthesize_heart_vector(rng, t, beats)
+
+    # Baseline wander and measurement noise make the deltas look like a real recording
+    wander = 0.05 * np.sin(2 * np.pi * rng.uniform(0.1, 0.4) * t + rng.uniform(0, 2 * np.pi))
+    heart += wander[None, :] + rng.normal(0, 0.004, heart.shape)
+
+    recorded = [label for label in EXTENDED_LABELS if label in LEAD_VECTORS][: channels - 4]
+    signals = dict(zip(recorded, project_leads(heart, recorded, 1000 / RESOLUTION)))
+    lead_i = signals["I"]
+    lead_ii = signals["II"]
+
+    def noise() -> npt.NDArray[np.int32]:
+        return rng.integers(-2, 3, SAMPLE_COUNT, dtype=np.int32)
+
+    # read_file reconstructs the derived limb leads from residuals, so store those residuals
+    lead_iii = lead_ii - lead_i + noise()
+    lead_avr = -((lead_i + lead_ii) // 2) + noise()
+    lead_avl = (lead_i - lead_iii) // 2 + noise()
+    lead_avf = (lead_ii + lead_iii) // 2 + noise()
+    stored = [
+        lead_i,
+        lead_ii,
+        lead_ii - lead_i - lead_iii,
+        -lead_avr - (lead_i + lead_ii) // 2,
+        (lead_i - lead_iii) // 2 - lead_avl,
+        (lead_ii + lead_iii) // 2 - lead_avf,
+    ] + [signals[label] for label in recorded[2:]]
+
+    return [lead.astype(np.int16) for lead in stored]
+
+
+def create_repbeats(
+    rng: np.random.Generator, labels: List[str], sampling_freq: int, resolution: float
+) -> List[npt.NDArray[np.int16]]:
+    t = np.arange(REPBEAT_SAMPLE_COUNT) / sampling_freq
+    heart = synthesize_heart_vector(rng, t, np.array([t[-1] * 0.4]))
+    return [lead.astype(np.int16) for lead in project_leads(heart, labels, 1000 / resolution)]
+
+
+def base64_text(data: bytes) -> str:
+    return encodebytes(data).decode("ascii").rstrip("\n")
+
+
+def render_repbeats(
+    rng: np.random.Generator, variant: CorpusVariant, labels: List[str]
+) -> List[str]:
+    if variant.doc_ver == "1.03":
+        sampling_freq, resolution = 1000, 1.0
+    else:
+        sampling_freq, resolution = int(rng.choice([500, 1000])), 2.5
+    duration = int(REPBEAT_SAMPLE_COUNT * 1000 / sampling_freq)
+
+    lines = [
+        f'    <repbeats dataencoding="Base64" samplespersec="{sampling_freq}" '
+        f'resolution="{resolution}" repbeatmethod="mean">'
+    ]
+    for label, samples in zip(labels, create_repbeats(rng, labels, sampling_freq, resolution)):
+        text = base64_text(samples.astype("<i2").tobytes())
+        if variant.doc_ver == "1.03":
+            # 1.03 schema included waveform data directly within the <repbeat> element
+            lines.append(
+                f'      <repbeat leadname="{label}" duration="{duration}">{text}</repbeat>'
+            )
+        else:
+            lines.append(f'      <repbeat leadname="{label}">')
+            lines.append(f'        <waveform duration="{duration}">{text}</waveform>')
+            lines.append("      </repbeat>")
+    lines.append("    </repbeats>")
+    return lines
+
+
+def render_file(seed: int, index: int, variant: CorpusVariant) -> str:
+    rng = np.random.default_rng([seed, index])
+    doc_type = DOCUMENT_TYPES[variant.doc_ver]
+    if variant.use_lead_labels:
+        labels = EXTENDED_LABELS[: variant.channels]
+    elif variant.acquisition_type in ["STD-12", "10-WIRE"]:
+        labels = STANDARD_LABELS + [f"Channel {x + 1}" for x in range(12, variant.channels)]
+    else:
+        labels = [f"Channel {x + 1}" for x in range(variant.channels)]
+
+    waveform_data = base64_text(xli_encode(create_leads(rng, variant.channels)))
+    if variant.use_lead_labels:
+        waveform_attrs = (
+            f'dataencoding="Base64" compression="XLI" numberofleads="{variant.channels}" '
+            f'leadlabels="{" ".join(labels)}" durationperchannel="{DURATION}" '
+            f'samplespersecond="{SAMPLING_FREQ}" resolution="{RESOLUTION}" signaloffset="0" '
+            'signalsigned="True" bitspersample="16"'
+        )
+    else:
+        waveform_attrs = (
+            'compressflag="True" compressmethod="XLI" filterflag="True" dataencoding="Base64" '
+            f'durationperchannel="{DURATION}" nbitspersample="16"'
+        )
+
+    lines = [
+        '<restingecgdata xmlns="http://www3.medical.philips.com" '
+        'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" status="New" lang="en">',
+        "  <documentinfo>",
+        f"    <documentname>synthetic-{seed}-{index:07d}.xml</documentname>",
+        f"    <documenttype>{doc_type}</documenttype>",
+        f"    <documentversion>{variant.doc_ver}</documentversion>",
+        "  </documentinfo>",
+        '  <dataacquisition date="2020-01-01" time="00:00:00" statflag="False">',
+        "    <signalcharacteristics>",
+        f"      <samplingrate>{SAMPLING_FREQ}</samplingrate>",
+        f"      <resolution>{RESOLUTION}</resolution>",
+        f"      <acquisitiontype>{variant.acquisition_type}</acquisitiontype>",
+        "      <bitspersample>16</bitspersample>",
+        "      <signaloffset>0</signaloffset>",
+        "      <signalsigned>True</signalsigned>",
+        f"      <numberchannelsallocated>{variant.channels}</numberchannelsallocated>",
+        f"      <numberchannelsvalid>{variant.channels}</numberchannelsvalid>",
+        "    </signalcharacteristics>",
+        "  </dataacquisition>",
+        "  <waveforms>",
+        f"    <parsedwaveforms {waveform_attrs}>{waveform_data}</parsedwaveforms>",
+    ]
+    if variant.include_repbeats:
+        lines += render_repbeats(rng, variant, labels)
+    lines += ["  </waveforms>", "</restingecgdata>"]
+
+    return "\n".join(lines) + "\n"
+
+
+def write_file(output_dir: str, seed: int, index: int) -> Tuple[str, int]:
+    variants = get_variants()
+    variant = variants[index % len(variants)]
+    filename = os.path.join(output_dir, get_file_name(index, variant))
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+
+    # Newer devices emit UTF-16 documents, which roughly doubles the bytes the parser sees
+    encoding = "utf-8" if variant.doc_ver == "1.03" else "utf-16"
+    header = f'<?xml version="1.0" encoding="{encoding}"?>\n'
+    data = (header + render_file(seed, index, variant)).encode(encoding)
+    with open(filename, "wb") as f:
+        f.write(data)
+
+    return filename, len(data)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic Sierra ECG corpus")
+    parser.add_argument("output_dir", help="directory to write the corpus into")
+    parser.add_argument("--count", type=int, default=len(get_variants()), help="files to write")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the synthetic signals")
+    parser.add_argument("--start", type=int, default=0, help="index of the first file")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="worker processes")
+    args = parser.parse_args()
+
+    indices = range(args.start, args.start + args.count)
+    total_bytes = 0
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        results = executor.map(
+            write_file,
+            [args.output_dir] * len(indices),
+            [args.seed] * len(indices),
+            indices,
+            chunksize=64,
+        )
+        for _, size in results:
+            total_bytes += size
+
+    print(f"Wrote {len(indices)} files ({total_bytes / 1e6:.1f} MB) to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Soak test `read_file` over a corpus of Philips Sierra ECG files.
+
+Reads the same files as `sierraecg validate` for the given paths (see `corpus.py` to generate a
+corpus) and reports files/sec, MB/sec and the peak resident set size of the process.
+
+Usage:
+
+    python benchmarks/soak.py path/to/corpus --include-repbeats --repeat 3
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Optional
+
+from sierraecg import read_file
+from sierraecg.cli import find_files
+
+
+def get_peak_rss() -> Optional[int]:
+    """Returns the peak resident set size of this process in bytes, if known"""
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return int(peak) if sys.platform == "darwin" else int(peak) * 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Soak test read_file over a corpus")
+    parser.add_argument("paths", nargs="+", help="corpus directories, files or glob patterns")
+    parser.add_argument("--include-repbeats", action="store_true", help="read repbeats too")
+    parser.add_argument("--repeat", type=int, default=1, help="passes over the corpus")
+    parser.add_argument("--limit", type=int, default=None, help="read at most this many files")
+    args = parser.parse_args()
+
+    filenames = find_files(args.paths)[: args.limit]
+    if len(filenames) == 0:
+        parser.error("no .xml files found")
+
+    sizes = [os.path.getsize(filename) for filename in filenames]
+    rss_before = get_peak_rss()
+
+    files = 0
+    failures = 0
+    total_bytes = 0
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for filename, size in zip(filenames, sizes):
+            try:
+                read_file(filename, include_repbeats=args.include_repbeats)
+            except Exception as e:
+                failures += 1
+                print(f"{filename}: {type(e).__name__}: {e}", file=sys.stderr)
+            files += 1
+            total_bytes += size
+    elapsed = time.perf_counter() - start
+
+    rss_after = get_peak_rss()
+
+    print(f"files:      {files} ({failures} failed)")
+    print(f"elapsed:    {elapsed:.2f} s")
+    print(f"throughput: {files / elapsed:.1f} files/sec, {total_bytes / elapsed / 1e6:.2f} MB/sec")
+    if rss_before is not None and rss_after is not None:
+        print(f"peak RSS:   {rss_after / 1e6:.1f} MB (before reading: {rss_before / 1e6:.1f} MB)")
+
+    if failures > 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
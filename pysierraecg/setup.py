@@ -37,6 +37,9 @@ setuptools.setup(
     #   Example: requests @ git+https://github.com/requests/requests.git@branch_or_tag
     #   See: https://github.com/pypa/pip/issues/6162
     install_requires=["defusedxml", "numpy"],
+    entry_points={
+        "console_scripts": ["sierraecg=sierraecg.cli:main"],
+    },
     zip_safe=False,
     license="MIT",
     classifiers=[
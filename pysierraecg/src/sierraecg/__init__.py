@@ -4,6 +4,7 @@ from .lib import (
     MissingXmlAttributeError,
     MissingXmlElementError,
     SierraEcgFile,
+    SierraReader,
     UnsupportedXmlFileError,
     read_file,
 )
@@ -14,6 +15,7 @@ __all__ = [
     "MissingXmlElementError",
     "MissingXmlAttributeError",
     "SierraEcgFile",
+    "SierraReader",
     "UnsupportedXmlFileError",
     "read_file",
 ]
@@ -0,0 +1,5 @@
+import sys
+
+from sierraecg.cli import main
+
+sys.exit(main())
@@ -0,0 +1,233 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import glob
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, Generator, List, Optional, Tuple
+
+from defusedxml import minidom
+import numpy as np
+
+from sierraecg.lib import SierraReader, get_root, read_header
+
+# Each worker process reads every file it is given with the same reader
+_reader: Optional[SierraReader] = None
+
+# The fields of each result kept for the summary, dropping any decoded samples
+SUMMARY_FIELDS = ["file", "ok", "error", "size", "elapsed_ms"]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the `sierraecg` command line tool.
+
+    Writes one JSON object per file to standard output and a summary of throughput, latency
+    and failures to standard error.
+
+    Parameters
+    ----------
+    argv : list of str, optional
+        Command line arguments, excluding the program name.
+        Default is `sys.argv[1:]`.
+
+    Returns
+    -------
+    int
+        The exit code: 0 if every file was processed, 1 if any file failed, 2 if no files
+        matched.
+    """
+    parser = argparse.ArgumentParser(prog="sierraecg", description="Philips Sierra ECG tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for command, description in [
+        ("validate", "check that files can be read"),
+        ("info", "print the document type, version and leads of files"),
+        ("dump", "print the decoded samples of files"),
+    ]:
+        subparser = subparsers.add_parser(command, help=description, description=description)
+        subparser.add_argument("paths", nargs="+", help="files, directories or glob patterns")
+        subparser.add_argument(
+            "-j",
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="number of worker processes (default: number of CPUs)",
+        )
+        subparser.add_argument(
+            "--slowest",
+            type=int,
+            default=5,
+            help="number of slowest files to list in the summary (default: 5)",
+        )
+        subparser.add_argument(
+            "--no-summary", action="store_true", help="do not print the summary"
+        )
+        if command != "info":
+            subparser.add_argument(
+                "--include-repbeats", action="store_true", help="read representative beats"
+            )
+
+    args = parser.parse_args(argv)
+    include_repbeats: bool = getattr(args, "include_repbeats", False)
+
+    filenames = find_files(args.paths)
+    if len(filenames) == 0:
+        print("sierraecg: no files found", file=sys.stderr)
+        return 2
+
+    start = time.perf_counter()
+    results: List[Dict[str, Any]] = []
+    processed = process_files(args.command, filenames, include_repbeats, args.workers)
+    try:
+        for result in processed:
+            print(json.dumps(result), flush=True)
+            results.append({key: result[key] for key in SUMMARY_FIELDS if key in result})
+    except BrokenPipeError:
+        processed.close()
+        # The reader went away (e.g. `| head`), send any remaining output to devnull so the
+        # interpreter does not report the broken pipe again when flushing stdout at exit
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 1
+    elapsed = time.perf_counter() - start
+
+    if not args.no_summary:
+        print_summary(results, elapsed, args.slowest)
+
+    return 0 if all(result["ok"] for result in results) else 1
+
+
+def find_files(paths: List[str]) -> List[str]:
+    """
+    Find the Philips Sierra ECG files named by `paths`.
+
+    Directories, including those matched by a glob pattern, are walked in sorted order for
+    `.xml` files. Files matched by a glob pattern are only included if they are `.xml` files,
+    while files named directly are always included.
+
+    Parameters
+    ----------
+    paths : list of str
+        Files, directories or glob patterns.
+
+    Returns
+    -------
+    list of str
+        The files to read.
+    """
+    filenames: List[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            filenames += walk_files(path)
+        elif any(c in path for c in "*?["):
+            for match in sorted(glob.glob(path, recursive=True)):
+                if os.path.isdir(match):
+                    filenames += walk_files(match)
+                elif os.path.isfile(match) and is_xml_file(match):
+                    filenames.append(match)
+        else:
+            # Missing files are reported as failures rather than silently skipped
+            filenames.append(path)
+    return filenames
+
+
+def walk_files(path: str) -> List[str]:
+    filenames: List[str] = []
+    for dirpath, dirnames, names in os.walk(path):
+        dirnames.sort()
+        filenames += [os.path.join(dirpath, name) for name in sorted(names) if is_xml_file(name)]
+    return filenames
+
+
+def is_xml_file(filename: str) -> bool:
+    return filename.lower().endswith(".xml")
+
+
+def process_files(
+    command: str, filenames: List[str], include_repbeats: bool, workers: int
+) -> Generator[Dict[str, Any], None, None]:
+    tasks = [(command, filename, include_repbeats) for filename in filenames]
+    if workers <= 1:
+        yield from map(process_file, tasks)
+        return
+
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        chunksize = max(1, min(64, len(tasks) // (workers * 4)))
+        yield from executor.map(process_file, tasks, chunksize=chunksize)
+    finally:
+        # Do not read the remaining files if the caller stops early
+        executor.shutdown(cancel_futures=True)
+
+
+def process_file(task: Tuple[str, str, bool]) -> Dict[str, Any]:
+    global _reader
+    if _reader is None:
+        _reader = SierraReader()
+
+    command, filename, include_repbeats = task
+    result: Dict[str, Any] = {"file": filename, "ok": True}
+    start = time.perf_counter()
+    try:
+        result["size"] = os.path.getsize(filename)
+        if command == "info":
+            result.update(read_info(filename))
+        else:
+            f = _reader.read_file(filename, include_repbeats=include_repbeats)
+            result["doc_type"] = f.doc_type
+            result["doc_ver"] = f.doc_ver
+            if command == "dump":
+                result["leads"] = {lead.label: lead.samples.tolist() for lead in f.leads}
+                if include_repbeats:
+                    result["repbeats"] = {
+                        label: repbeat.samples.tolist() for label, repbeat in f.repbeats.items()
+                    }
+    except Exception as e:
+        result["ok"] = False
+        result["error"] = type(e).__name__
+        result["message"] = str(e)
+    result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    return result
+
+
+def read_info(filename: str) -> Dict[str, Any]:
+    header = read_header(get_root(minidom.parse(filename), "restingecgdata"))
+    return {
+        "doc_type": header.doc_type,
+        "doc_ver": header.doc_ver,
+        "sampling_freq": header.sampling_freq,
+        "duration": header.duration,
+        "compression": header.compression,
+        "leads": header.labels,
+        "repbeats": header.repbeats is not None,
+    }
+
+
+def print_summary(results: List[Dict[str, Any]], elapsed: float, slowest: int) -> None:
+    failures: Dict[str, int] = {}
+    for result in results:
+        if not result["ok"]:
+            failures[result["error"]] = failures.get(result["error"], 0) + 1
+
+    total_bytes = sum(result.get("size", 0) for result in results)
+    latencies = np.array([result["elapsed_ms"] for result in results])
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+
+    lines = [
+        f"files:      {len(results)} ({len(results) - sum(failures.values())} ok, "
+        f"{sum(failures.values())} failed)",
+        f"elapsed:    {elapsed:.2f} s",
+        f"throughput: {len(results) / elapsed:.1f} files/sec, "
+        f"{total_bytes / elapsed / 1e6:.2f} MB/sec",
+        f"latency:    p50 {p50:.1f} ms, p90 {p90:.1f} ms, p99 {p99:.1f} ms, "
+        f"max {latencies.max():.1f} ms",
+    ]
+    for error, count in sorted(failures.items()):
+        lines.append(f"failed:     {count} {error}")
+    if slowest > 0:
+        lines.append("slowest:")
+        for result in sorted(results, key=lambda r: r["elapsed_ms"], reverse=True)[:slowest]:
+            lines.append(f"  {result['elapsed_ms']:>10.1f} ms  {result['file']}")
+
+    print("\n".join(lines), file=sys.stderr)
@@ -1,13 +1,12 @@
 from base64 import b64decode
-from math import floor
 from typing import Dict, List, Optional, Tuple, Union, cast
-from xml.dom.minidom import Attr, Document
+from xml.dom.minidom import Attr, Document, Element
 
 from defusedxml import minidom
 import numpy as np
 import numpy.typing as npt
 
-from sierraecg.xli import xli_decode
+from sierraecg.xli import XliDecoder
 
 
 class UnsupportedXmlFileError(RuntimeError):
@@ -42,6 +41,20 @@ class EcgRepbeat:
     samples: npt.NDArray[np.int16] = np.array([], dtype=np.int16)
 
 
+class SierraEcgHeader:
+    """Represents the elements and attributes needed to decode a Sierra ECG File"""
+
+    doc_type: str = ""
+    doc_ver: str = ""
+    sampling_freq: int = 0
+    duration: int = 0
+    labels: List[str] = []
+    encoding: str = ""
+    compression: str = ""
+    waveform_text: str = ""
+    repbeats: Optional[Document] = None
+
+
 class SierraEcgFile:
     """Represents a Sierra ECG File"""
 
@@ -51,10 +64,72 @@ class SierraEcgFile:
     repbeats: Dict[str, EcgRepbeat] = {}
 
 
+class SierraReader:
+    """
+    Reads Philips Sierra ECG files, keeping decoder tables and scratch buffers between files.
+
+    Long-lived workers reading many files should reuse a single reader rather than calling
+    `read_file`. A reader is not thread-safe; use one reader per thread.
+    """
+
+    xli_decoder: XliDecoder
+
+    def __init__(self) -> None:
+        self.xli_decoder = XliDecoder()
+
+    def read_file(self, filename: str, include_repbeats: bool = False) -> SierraEcgFile:
+        """
+        Read a Philips Sierra ECG file.
+
+        Parameters
+        ----------
+        filename : str
+            Path to the Philips Sierra ECG file.
+
+        include_repbeats : bool
+            Indicates whether to include representative beats.
+            Default is False.
+
+        Returns
+        -------
+        SierraEcgFile
+            The parsed Philips Sierra ECG file.
+        """
+        xdom = minidom.parse(filename)
+        root = get_root(xdom, "restingecgdata")
+        header = read_header(root)
+
+        leads = assert_leads(header, self.xli_decoder)
+
+        lead_i = leads[0].samples
+        lead_ii = leads[1].samples
+        lead_iii = leads[2].samples
+        lead_avr = leads[3].samples
+        lead_avl = leads[4].samples
+        lead_avf = leads[5].samples
+
+        # The derived limb leads are stored as residuals, computed with 16-bit arithmetic
+        lead_iii[:] = lead_ii - lead_i - lead_iii
+        lead_avr[:] = -lead_avr - (lead_i + lead_ii) // 2
+        lead_avl[:] = (lead_i - lead_iii) // 2 - lead_avl
+        lead_avf[:] = (lead_ii + lead_iii) // 2 - lead_avf
+
+        sierra_ecg_file = SierraEcgFile()
+        sierra_ecg_file.doc_type = header.doc_type
+        sierra_ecg_file.doc_ver = header.doc_ver
+        sierra_ecg_file.leads = leads
+
+        if include_repbeats:
+            repbeats = assert_reps(header)
+            sierra_ecg_file.repbeats = repbeats
+
+        return sierra_ecg_file
+
+
 def read_file(filename: str, include_repbeats: bool = False) -> SierraEcgFile:
     """
     Read a Philips Sierra ECG file.
-    
+
     Parameters
     ----------
     filename : str
@@ -69,47 +144,33 @@ def read_file(filename: str, include_repbeats: bool = False) -> SierraEcgFile:
     SierraEcgFile
         The parsed Philips Sierra ECG file.
     """
-    xdom = minidom.parse(filename)
-    root = get_node(xdom, "restingecgdata")
-    (doc_type, doc_ver) = assert_version(root)
-
-    leads, labels = assert_leads(root)
-
-    lead_i = leads[0].samples
-    lead_ii = leads[1].samples
-    lead_iii = leads[2].samples
-    lead_avr = leads[3].samples
-    lead_avl = leads[4].samples
-    lead_avf = leads[5].samples
+    return SierraReader().read_file(filename, include_repbeats)
 
-    for i in range(len(lead_iii)):
-        lead_iii[i] = lead_ii[i] - lead_i[i] - lead_iii[i]
 
-    for i in range(len(lead_avr)):
-        lead_avr[i] = -lead_avr[i] - floor((lead_i[i] + lead_ii[i]) / 2)
+def read_header(elt: Document) -> SierraEcgHeader:
+    """Resolves every element and attribute needed to decode the file in a single pass"""
+    header = SierraEcgHeader()
+    header.doc_type, header.doc_ver = assert_version(elt)
 
-    for i in range(len(lead_avl)):
-        lead_avl[i] = floor((lead_i[i] - lead_iii[i]) / 2) - lead_avl[i]
+    signal_details = get_child(get_child(elt, "dataacquisition"), "signalcharacteristics")
+    waveforms = get_opt_child(elt, "waveforms") or elt
+    parsed_waveforms = get_child(waveforms, "parsedwaveforms")
 
-    for i in range(len(lead_avf)):
-        lead_avf[i] = floor((lead_ii[i] + lead_iii[i]) / 2) - lead_avf[i]
+    header.sampling_freq = int(get_text(get_child(signal_details, "samplingrate")))
+    header.duration = int(get_attr(parsed_waveforms, "durationperchannel"))
+    header.labels = get_or_create_labels(signal_details, parsed_waveforms)
+    header.encoding = get_attr(parsed_waveforms, "dataencoding")
+    header.compression = infer_compression(parsed_waveforms)
+    header.waveform_text = get_text(parsed_waveforms)
+    header.repbeats = get_opt_child(waveforms, "repbeats")
 
-    sierra_ecg_file = SierraEcgFile()
-    sierra_ecg_file.doc_type = doc_type
-    sierra_ecg_file.doc_ver = doc_ver
-    sierra_ecg_file.leads = leads
-
-    if include_repbeats:
-        repbeats = assert_reps(root)
-        sierra_ecg_file.repbeats = repbeats
-
-    return sierra_ecg_file
+    return header
 
 
 def assert_version(elt: Document) -> Tuple[str, str]:
-    doc_info = get_node(elt, "documentinfo")
-    doc_type = get_text(get_node(doc_info, "documenttype"))
-    doc_ver = get_text(get_node(doc_info, "documentversion"))
+    doc_info = get_child(elt, "documentinfo")
+    doc_type = get_text(get_child(doc_info, "documenttype"))
+    doc_ver = get_text(get_child(doc_info, "documentversion"))
     if doc_type not in ["SierraECG", "PhilipsECG"] or doc_ver not in [
         "1.03",
         "1.04",
@@ -121,35 +182,34 @@ def assert_version(elt: Document) -> Tuple[str, str]:
     return (doc_type, doc_ver)
 
 
-def assert_leads(elt: Document) -> Tuple[List[EcgLead], List[str]]:
-    signal_details = get_node(get_node(elt, "dataacquisition"), "signalcharacteristics")
-    parsed_waveforms = get_node(elt, "parsedwaveforms")
-
-    sampling_freq = int(get_text(get_node(signal_details, "samplingrate")))
-    duration = int(get_attr(parsed_waveforms, "durationperchannel"))
-
-    labels = get_or_create_labels(signal_details, parsed_waveforms)
-    waveform_data = get_waveform_data(signal_details, parsed_waveforms, labels)
+def assert_leads(
+    header: SierraEcgHeader, xli_decoder: Optional[XliDecoder] = None
+) -> List[EcgLead]:
+    waveform_data = get_waveform_data(header, xli_decoder)
 
     leads: List[EcgLead] = []
-    for index, label in enumerate(labels):
+    for index, label in enumerate(header.labels):
         lead = EcgLead()
         lead.label = label
-        lead.sampling_freq = sampling_freq
-        lead.duration = duration
+        lead.sampling_freq = header.sampling_freq
+        lead.duration = header.duration
         lead.samples = waveform_data[index]
         leads.append(lead)
 
-    return leads, labels
+    return leads
 
 
-def assert_reps(elt: Document) -> Dict[str, EcgRepbeat]:
-    elt_repbeats = get_opt_node(elt, "repbeats")
+def assert_reps(header: SierraEcgHeader) -> Dict[str, EcgRepbeat]:
+    elt_repbeats = header.repbeats
     if elt_repbeats is None:
         return {}
 
     # get repbeats dataencoding
     encoding = get_attr(elt_repbeats, "dataencoding")
+    if encoding != "Base64":
+        raise UnsupportedXmlFileError(
+            f"Representative beat waveform data encoding unsupported: {encoding}"
+        )
 
     # Optional in 1.03 files
     samplingrate = int(get_attr(elt_repbeats, "samplespersec", "0"))
@@ -157,39 +217,21 @@ def assert_reps(elt: Document) -> Dict[str, EcgRepbeat]:
     method = get_attr(elt_repbeats, "repbeatmethod", "")
 
     repbeats: Dict[str, EcgRepbeat] = {}
-    for item in get_nodes(elt_repbeats, "repbeat"):
+    for item in get_children(elt_repbeats, "repbeat"):
         repbeat = EcgRepbeat()
         repbeat.label = get_attr(item, "leadname")
         repbeat.sampling_freq = samplingrate
         repbeat.resolution = resolution
         repbeat.method = method
 
-        waveform = get_opt_node(item, "waveform")
-        if waveform is not None:
-            duration = int(get_attr(waveform, "duration"))
-            repbeat.duration = duration
-
-            if encoding == "Base64":
-                decoded_waveform_data = read_base64_encoding(get_text(waveform))
-            else:
-                raise UnsupportedXmlFileError(
-                    f"Representative beat waveform data encoding unsupported: {encoding}"
-                )
-
-            repbeat.samples = np.frombuffer(decoded_waveform_data, dtype=np.int16)
-        else:
-            duration = int(get_attr(item, "duration"))
-            repbeat.duration = duration
-
-            # 1.03 schema included waveform data directly within the <repbeat> element
-            if encoding == "Base64":
-                decoded_waveform_data = read_base64_encoding(get_text(item))
-            else:
-                raise UnsupportedXmlFileError(
-                    f"Representative beat waveform data encoding unsupported: {encoding}"
-                )
+        # 1.03 schema included waveform data directly within the <repbeat> element
+        waveform = get_opt_child(item, "waveform")
+        if waveform is None:
+            waveform = item
 
-            repbeat.samples = np.frombuffer(decoded_waveform_data, dtype=np.int16)
+        repbeat.duration = int(get_attr(waveform, "duration"))
+        decoded_waveform_data = read_base64_encoding(get_text(waveform))
+        repbeat.samples = np.frombuffer(decoded_waveform_data, dtype=np.int16)
 
         repbeats[repbeat.label] = repbeat
 
@@ -197,29 +239,27 @@ def assert_reps(elt: Document) -> Dict[str, EcgRepbeat]:
 
 
 def get_waveform_data(
-    signal_details: Document, parsed_waveforms: Document, labels: List[str]
+    header: SierraEcgHeader, xli_decoder: Optional[XliDecoder] = None
 ) -> List[npt.NDArray[np.int16]]:
-    sampling_freq = int(get_text(get_node(signal_details, "samplingrate")))
-    duration = int(get_attr(parsed_waveforms, "durationperchannel"))
-    sample_count = int(duration * (sampling_freq / 1000))
+    sample_count = int(header.duration * (header.sampling_freq / 1000))
 
-    encoding = get_attr(parsed_waveforms, "dataencoding")
     waveform_data = None
-    if encoding == "Base64":
-        waveform_data = read_base64_encoding(get_text(parsed_waveforms))
+    if header.encoding == "Base64":
+        waveform_data = read_base64_encoding(header.waveform_text)
     else:
-        raise UnsupportedXmlFileError(f"Waveform data encoding unsupported: {encoding}")
+        raise UnsupportedXmlFileError(f"Waveform data encoding unsupported: {header.encoding}")
 
-    compression_method = infer_compression(parsed_waveforms)
-    if compression_method != "Uncompressed":
-        if compression_method == "XLI":
-            return xli_decode(waveform_data, labels)
+    if header.compression != "Uncompressed":
+        if header.compression == "XLI":
+            if xli_decoder is None:
+                xli_decoder = XliDecoder()
+            return xli_decoder.decode(waveform_data)
         else:
             raise UnsupportedXmlFileError(
-                f"Waveform data compression algorithm unsupported: {compression_method}"
+                f"Waveform data compression algorithm unsupported: {header.compression}"
             )
 
-    return split_leads(waveform_data, len(labels), sample_count)
+    return split_leads(waveform_data, len(header.labels), sample_count)
 
 
 def read_base64_encoding(text: str) -> bytes:
@@ -227,11 +267,10 @@ def read_base64_encoding(text: str) -> bytes:
 
 
 def infer_compression(parsed_waveforms: Document) -> str:
-    return get_attr(
-        parsed_waveforms,
-        "compressmethod",
-        get_attr(parsed_waveforms, "compression", "Uncompressed"),
-    )
+    compression = get_attr(parsed_waveforms, "compressmethod", "")
+    if compression == "":
+        compression = get_attr(parsed_waveforms, "compression", "Uncompressed")
+    return compression
 
 
 def split_leads(
@@ -255,8 +294,8 @@ def get_or_create_labels(signal_details: Document, parsed_waveforms: Document) -
         lead_count = int(get_attr(parsed_waveforms, "numberofleads"))
         return lead_labels.split(" ")[:lead_count]
     else:
-        good_channels = int(get_text(get_node(signal_details, "numberchannelsallocated")))
-        leads_used = get_text(get_node(signal_details, "acquisitiontype"))
+        good_channels = int(get_text(get_child(signal_details, "numberchannelsallocated")))
+        leads_used = get_text(get_child(signal_details, "acquisitiontype"))
         return [get_lead_name(leads_used, x + 1) for x in range(good_channels)]
 
 
@@ -280,6 +319,13 @@ def get_lead_name(leads_used: str, index: int) -> str:
     return f"Channel {index}"
 
 
+def get_root(xdoc: Document, tag_name: str) -> Document:
+    xelt = xdoc.documentElement
+    if xelt is not None and xelt.tagName == tag_name:
+        return cast(Document, xelt)
+    return get_node(xdoc, tag_name)
+
+
 def get_node(xdoc: Document, tag_name: str) -> Document:
     xelt = get_opt_node(xdoc, tag_name)
     if xelt is None:
@@ -297,9 +343,34 @@ def get_nodes(xdoc: Document, tag_name: str) -> List[Document]:
     return [cast(Document, xelt) for xelt in xdoc.getElementsByTagName(tag_name)]
 
 
+def get_child(xdoc: Document, tag_name: str) -> Document:
+    xelt = get_opt_child(xdoc, tag_name)
+    if xelt is None:
+        raise MissingXmlElementError(tag_name)
+    return xelt
+
+
+def get_opt_child(xdoc: Document, tag_name: str) -> Optional[Document]:
+    for xelt in xdoc.childNodes:
+        if xelt.nodeType == xelt.ELEMENT_NODE and xelt.tagName == tag_name:
+            return cast(Document, xelt)
+    # Fall back to searching the whole subtree for files which nest the element elsewhere
+    return get_opt_node(xdoc, tag_name)
+
+
+def get_children(xdoc: Document, tag_name: str) -> List[Document]:
+    xelts = [
+        cast(Document, xelt)
+        for xelt in xdoc.childNodes
+        if xelt.nodeType == xelt.ELEMENT_NODE and xelt.tagName == tag_name
+    ]
+    return xelts if len(xelts) > 0 else get_nodes(xdoc, tag_name)
+
+
 def get_attr(xdoc: Document, attr_name: str, default: Optional[str] = None) -> str:
-    if attr_name in xdoc.attributes:
-        return get_text(xdoc.attributes[attr_name])
+    xattr = cast(Element, xdoc).getAttributeNode(attr_name)
+    if xattr is not None:
+        return str(xattr.value)
     if default is None:
         raise MissingXmlAttributeError(attr_name)
     return default
@@ -1,5 +1,5 @@
 from array import array
-from typing import Dict, MutableSequence, Optional
+from typing import Dict, MutableSequence, Optional, Sequence
 
 
 class LzwDecoder(object):
@@ -21,10 +21,23 @@ class LzwDecoder(object):
     position = 0
 
     def __init__(self, buffer: bytes, bits: int):
-        self.buffer = buffer
         self.bits = bits
         self.max_code = (1 << bits) - 2
         self.strings = {code: array("B", [code]) for code in range(256)}
+        self.reset(buffer)
+
+    def reset(self, buffer: bytes) -> None:
+        """Prepares the decoder to read a new buffer, reusing its string table"""
+        self.buffer = buffer
+        self.offset = 0
+        self.bit_count = 0
+        self.bit_buffer = 0
+        self.previous = array("B", [])
+        # Strings from next_code onwards are left over from the previous buffer and are
+        # overwritten as the table is rebuilt
+        self.next_code = 256
+        self.current = None
+        self.position = 0
 
     def read(self) -> int:
         if self.current is None or self.position == len(self.current):
@@ -41,28 +54,103 @@ class LzwDecoder(object):
     def read_bytes(self, count: int) -> MutableSequence[int]:
         return array("B", [self.read() for _ in range(count)])
 
+    def read_into(self, output: bytearray, offset: int = 0) -> int:
+        """
+        Writes every remaining decoded byte into `output` starting at `offset`, growing it only
+        when it is too small, and returns the offset following the last byte written.
+        """
+        if self.current is not None:
+            offset = write_into(output, offset, self.current[self.position :])
+            self.current = None
+            self.position = 0
+
+        # Equivalent to calling _read_next_string until it returns an empty string, with the
+        # decoder state held in locals for speed.
+        buffer = self.buffer
+        position = self.offset
+        bits = self.bits
+        max_code = self.max_code
+        bit_count = self.bit_count
+        bit_buffer = self.bit_buffer
+        strings = self.strings
+        previous = self.previous
+        next_code = self.next_code
+        while True:
+            while bit_count <= 24 and position < len(buffer):
+                bit_buffer |= buffer[position] << (24 - bit_count)
+                position += 1
+                bit_count += 8
+
+            if bit_count < bits:
+                break
+
+            code = (bit_buffer >> (32 - bits)) & 0x0000FFFF
+            bit_buffer = (bit_buffer << bits) & 0xFFFFFFFF
+            bit_count -= bits
+            if code > max_code:
+                break
+
+            # A code not yet in the table refers to the string being added, which repeats the
+            # first byte of the previous string
+            pending = code >= next_code
+            first = previous[0] if pending else strings[code][0]
+            if len(previous) > 0 and next_code <= max_code:
+                recycled = strings.get(next_code)
+                if recycled is None:
+                    entry = previous[:]
+                    strings[next_code] = entry
+                else:
+                    entry = recycled
+                    entry[:] = previous
+                entry.append(first)
+                next_code += 1
+
+            data = entry if pending else strings[code]
+            previous = data
+
+            end = offset + len(data)
+            if end > len(output):
+                offset = write_into(output, offset, data)
+            else:
+                output[offset:end] = data
+                offset = end
+
+        self.offset = position
+        self.bit_count = bit_count
+        self.bit_buffer = bit_buffer
+        self.previous = previous
+        self.next_code = next_code
+
+        return offset
+
     def _read_next_string(self) -> MutableSequence[int]:
         code = self._read_codepoint()
         if code >= 0 and code <= self.max_code:
-            data: Optional[MutableSequence[int]] = None
-            if code not in self.strings:
-                data = self.previous[:]
-                data.append(self.previous[0])
-                self.strings[code] = data
-            else:
+            if code < self.next_code:
                 data = self.strings[code]
-
-            if len(self.previous) > 0 and self.next_code <= self.max_code:
-                next_data = self.previous[:]
-                next_data.append(data[0])
-                self.strings[self.next_code] = next_data
-                self.next_code += 1
+                if len(self.previous) > 0 and self.next_code <= self.max_code:
+                    self._add_string(data[0])
+            else:
+                # The code refers to the string being added, which repeats its first byte
+                data = self._add_string(self.previous[0])
 
             self.previous = data
             return data
 
         return array("B", [])
 
+    def _add_string(self, byte: int) -> MutableSequence[int]:
+        # Strings left over from a previous buffer are refilled rather than reallocated
+        entry = self.strings.get(self.next_code)
+        if entry is None:
+            entry = self.previous[:]
+            self.strings[self.next_code] = entry
+        else:
+            entry[:] = self.previous
+        entry.append(byte)
+        self.next_code += 1
+        return entry
+
     def _read_codepoint(self) -> int:
         code = 0
         while self.bit_count <= 24:
@@ -81,3 +169,68 @@ class LzwDecoder(object):
         self.bit_count -= self.bits
 
         return code
+
+
+def write_into(output: bytearray, offset: int, data: Sequence[int]) -> int:
+    end = offset + len(data)
+    if end > len(output):
+        # Grow geometrically so a reused buffer quickly reaches a steady size
+        output.extend(bytes(max(end - len(output), len(output))))
+    output[offset:end] = data
+    return end
+
+
+class LzwEncoder(object):
+    """Provides an encoder for LZW compression"""
+
+    bits = 0
+    max_code = 0
+
+    bit_count = 0
+    bit_buffer = 0
+
+    next_code = 256
+    strings: Dict[bytes, int] = {}
+
+    output: bytearray
+
+    def __init__(self, bits: int):
+        self.bits = bits
+        self.max_code = (1 << bits) - 2
+        self.strings = {bytes([code]): code for code in range(256)}
+        self.output = bytearray()
+
+    def encode(self, data: bytes) -> bytes:
+        current = b""
+        for byte in data:
+            candidate = current + bytes([byte])
+            if candidate in self.strings:
+                current = candidate
+                continue
+
+            self._write_codepoint(self.strings[current])
+            if self.next_code <= self.max_code:
+                self.strings[candidate] = self.next_code
+                self.next_code += 1
+
+            current = candidate[-1:]
+
+        if len(current) > 0:
+            self._write_codepoint(self.strings[current])
+
+        # Flush any remaining bits, padded with zeros; fewer than `bits` trailing bits are
+        # treated as the end of the stream by LzwDecoder.
+        if self.bit_count > 0:
+            self.output.append((self.bit_buffer << (8 - self.bit_count)) & 0xFF)
+            self.bit_buffer = 0
+            self.bit_count = 0
+
+        return bytes(self.output)
+
+    def _write_codepoint(self, code: int) -> None:
+        self.bit_buffer = (self.bit_buffer << self.bits) | (code & ((1 << self.bits) - 1))
+        self.bit_count += self.bits
+        while self.bit_count >= 8:
+            self.bit_count -= 8
+            self.output.append((self.bit_buffer >> self.bit_count) & 0xFF)
+        self.bit_buffer &= (1 << self.bit_count) - 1
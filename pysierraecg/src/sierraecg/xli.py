@@ -1,57 +1,136 @@
-from typing import List
+from typing import List, Tuple
 
 import numpy as np
 import numpy.typing as npt
 
-from sierraecg.lzw import LzwDecoder
+from sierraecg.lzw import LzwDecoder, LzwEncoder, write_into
+
+
+class XliDecoder(object):
+    """
+    Provides a decoder for XLI compressed waveform data.
+
+    The LZW string table and scratch buffers are kept between calls to `decode`, so reusing
+    one decoder for many files avoids rebuilding them. A decoder is not thread-safe; use one
+    per thread.
+    """
+
+    lzw: LzwDecoder
+    buffer: bytearray
+    unpacked: npt.NDArray[np.uint16]
+    work: npt.NDArray[np.int64]
+
+    def __init__(self) -> None:
+        self.lzw = LzwDecoder(b"", bits=10)
+        self.buffer = bytearray()
+        self.unpacked = np.empty(0, dtype=np.uint16)
+        self.work = np.empty(0, dtype=np.int64)
+
+    def decode(self, data: bytes) -> List[npt.NDArray[np.int16]]:
+        # Decompress every chunk into the scratch buffer first, so that the leads can share a
+        # single output array. Each entry is (byte offset, sample count, first delta).
+        chunks: List[Tuple[int, int, int]] = []
+        length = 0
+        offset = 0
+        while offset < len(data):
+            header = data[offset : offset + 8]
+            offset += 8
+
+            size = int.from_bytes(header[0:4], byteorder="little", signed=True)
+            start = int.from_bytes(header[6:], byteorder="little", signed=True)
+            self.lzw.reset(data[offset : offset + size])
+            offset += size
+
+            end = self.lzw.read_into(self.buffer, length)
+            if (end - length) % 2 == 1:
+                end = write_into(self.buffer, end, b"\x00")
+
+            chunks.append((length, (end - length) // 2, start))
+            length = end
+
+        # The output array is never reused, callers own the samples returned to them
+        samples: npt.NDArray[np.int16] = np.empty(length // 2, dtype=np.int16)
+        leads: List[npt.NDArray[np.int16]] = []
+        position = 0
+        for offset, count, start in chunks:
+            lead = samples[position : position + count]
+            self._decode_deltas(offset, count, start, lead)
+            leads.append(lead)
+            position += count
+
+        return leads
+
+    def _decode_deltas(
+        self, offset: int, count: int, first: int, output: npt.NDArray[np.int16]
+    ) -> None:
+        if count == 0:
+            return
+
+        if len(self.work) < count:
+            self.unpacked = np.empty(count, dtype=np.uint16)
+            self.work = np.empty(count, dtype=np.int64)
+
+        # Deltas are stored as all of their high bytes followed by all of their low bytes
+        high = np.frombuffer(self.buffer, dtype=np.uint8, count=count, offset=offset)
+        low = np.frombuffer(self.buffer, dtype=np.uint8, count=count, offset=offset + count)
+        unpacked = self.unpacked[:count]
+        np.left_shift(high, 8, out=unpacked, dtype=np.uint16)
+        np.bitwise_or(unpacked, low, out=unpacked)
+        deltas = unpacked.view(np.int16)
+
+        # Each sample is twice the previous one, less the one before that and the preceding
+        # delta code (offset by 64, or the chunk's first delta): integrate the second
+        # differences twice.
+        work = self.work[:count]
+        work[0] = deltas[0]
+        if count > 1:
+            work[1] = int(deltas[1]) - 2 * int(deltas[0])
+        if count > 2:
+            work[2] = -first
+        if count > 3:
+            np.subtract(64, deltas[2 : count - 1], out=work[3:], dtype=np.int64)
+        np.cumsum(work, out=work)
+        np.cumsum(work, out=work)
+        np.copyto(output, work, casting="unsafe")
 
 
 def xli_decode(data: bytes, labels: List[str]) -> List[npt.NDArray[np.int16]]:
-    samples: List[npt.NDArray[np.int16]] = []
-    offset = 0
-    while offset < len(data):
-        header = data[offset : offset + 8]
-        offset += 8
-
-        size = int.from_bytes(header[0:4], byteorder="little", signed=True)
-        start = int.from_bytes(header[6:], byteorder="little", signed=True)
-        chunk = data[offset : offset + size]
-        offset += size
-
-        decoder = LzwDecoder(chunk, bits=10)
-
-        buffer = []
-        while -1 != (b := decoder.read()):
-            buffer.append(b & 0xFF)
-
-        if len(buffer) % 2 == 1:
-            buffer.append(0)
-
-        deltas = xli_decode_deltas(buffer, start)
-        samples.append(deltas)
-
-    return samples
-
-
-def xli_decode_deltas(buffer: List[int], first: int) -> npt.NDArray[np.int16]:
-    deltas = xli_unpack(buffer)
-    x = int(deltas[0])
-    y = int(deltas[1])
-    last = first
-    for i in range(2, len(deltas)):
-        z = (y + y) - x - last
-        last = int(deltas[i]) - 64
-        deltas[i] = z
-        x = y
-        y = z
-    return deltas
-
-
-def xli_unpack(buffer: List[int]) -> npt.NDArray[np.int16]:
-    unpacked: npt.NDArray[np.int16] = np.array(
-        [0 for _ in range(int(len(buffer) / 2))], dtype=np.int16
-    )
-    for i in range(len(unpacked)):
-        joined_bytes = (((buffer[i] << 8) | buffer[len(unpacked) + i]) << 16) >> 16
-        unpacked[i] = np.array(joined_bytes).astype(np.int16)
-    return unpacked
+    return XliDecoder().decode(data)
+
+
+def xli_encode(leads: List[npt.NDArray[np.int16]]) -> bytes:
+    chunks = bytearray()
+    for samples in leads:
+        start, buffer = xli_encode_deltas(samples)
+        chunk = LzwEncoder(bits=10).encode(buffer)
+
+        chunks += len(chunk).to_bytes(4, byteorder="little", signed=True)
+        chunks += (1).to_bytes(2, byteorder="little", signed=True)
+        chunks += start.to_bytes(2, byteorder="little", signed=True)
+        chunks += chunk
+
+    return bytes(chunks)
+
+
+def xli_encode_deltas(samples: npt.NDArray[np.int16]) -> Tuple[int, bytes]:
+    values = samples.astype(np.int32)
+    deltas = np.full(len(values), 64, dtype=np.int32)
+    deltas[0:2] = values[0:2]
+
+    # Each sample is predicted from the two before it; the residual of sample i is carried by
+    # the header for i == 2 and by delta code i - 1 (offset by 64) thereafter.
+    start = 0
+    if len(values) > 2:
+        residuals = 2 * values[1:-1] - values[:-2] - values[2:]
+        start = int(residuals[0])
+        deltas[2:-1] = residuals[1:] + 64
+
+    if start < -32768 or start > 32767 or np.any((deltas < -32768) | (deltas > 32767)):
+        raise ValueError("Samples change too quickly to be represented by XLI delta codes")
+
+    return start, xli_pack(deltas.astype(np.int16))
+
+
+def xli_pack(deltas: npt.NDArray[np.int16]) -> bytes:
+    packed = deltas.astype(">i2").view(np.uint8).reshape(-1, 2)
+    return packed[:, 0].tobytes() + packed[:, 1].tobytes()
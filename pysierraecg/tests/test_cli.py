@@ -0,0 +1,106 @@
+import json
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+import pytest
+
+from sierraecg.cli import find_files, main
+
+
+def read_results(output: str) -> List[Dict[str, Any]]:
+    return [json.loads(line) for line in output.splitlines()]
+
+
+def test_validate(capsys: pytest.CaptureFixture[str]) -> None:
+    assert main(["validate", "tests/fixtures/1_03", "tests/fixtures/1_04_01", "-j", "1"]) == 0
+
+    captured = capsys.readouterr()
+    results = read_results(captured.out)
+    assert [result["file"] for result in results] == [
+        "tests/fixtures/1_03/129DYPRG.XML",
+        "tests/fixtures/1_03/repbeats_example.xml",
+        "tests/fixtures/1_04_01/2020-5-18_15-48-11.xml",
+    ]
+    assert all(result["ok"] for result in results)
+    assert results[2]["doc_ver"] == "1.04.01"
+    assert "files:      3 (3 ok, 0 failed)" in captured.err
+    assert "latency:" in captured.err
+    assert "slowest:" in captured.err
+
+
+def test_validate_failures(capsys: pytest.CaptureFixture[str]) -> None:
+    assert main(["validate", "tests/fixtures/invalid-*.xml", "missing.xml", "-j", "2"]) == 1
+
+    captured = capsys.readouterr()
+    results = read_results(captured.out)
+    assert [result["error"] for result in results] == [
+        "UnsupportedXmlFileError",
+        "UnsupportedXmlFileError",
+        "FileNotFoundError",
+    ]
+    assert results[0]["message"] == "Files of type MortaraECG 1.03 are unsupported"
+    assert "failed:     2 UnsupportedXmlFileError" in captured.err
+    assert "failed:     1 FileNotFoundError" in captured.err
+
+
+def test_info(capsys: pytest.CaptureFixture[str]) -> None:
+    filename = "tests/fixtures/1_04/3191723_ZZDEMOPTONLY_1-04_orig.xml"
+    assert main(["info", filename, "-j", "1", "--no-summary"]) == 0
+
+    captured = capsys.readouterr()
+    (result,) = read_results(captured.out)
+    assert result["doc_type"] == "PhilipsECG"
+    assert result["doc_ver"] == "1.04"
+    assert result["sampling_freq"] == 500
+    assert result["leads"][-1] == "V6"
+    assert result["repbeats"] is True
+    assert captured.err == ""
+
+
+def test_dump(capsys: pytest.CaptureFixture[str]) -> None:
+    filename = "tests/fixtures/1_04_01/2020-5-18_15-48-11.xml"
+    assert main(["dump", filename, "-j", "1", "--include-repbeats", "--no-summary"]) == 0
+
+    (result,) = read_results(capsys.readouterr().out)
+    assert len(result["leads"]["I"]) == 5500
+    assert result["leads"]["II"][2750] == 78
+    assert result["repbeats"]["V6"][600] == -52
+
+
+def test_no_files(capsys: pytest.CaptureFixture[str]) -> None:
+    assert main(["validate", "tests/fixtures/*.json"]) == 2
+    assert "no files found" in capsys.readouterr().err
+
+
+def test_dump_summary(capsys: pytest.CaptureFixture[str]) -> None:
+    filename = "tests/fixtures/1_04_01/2020-5-18_15-48-11.xml"
+    assert main(["dump", filename, "-j", "1"]) == 0
+
+    captured = capsys.readouterr()
+    assert "files:      1 (1 ok, 0 failed)" in captured.err
+    assert f"ms  {filename}" in captured.err
+
+
+def test_find_files() -> None:
+    assert find_files(["tests/fixtures/1_0*"]) == find_files(
+        ["tests/fixtures/1_03", "tests/fixtures/1_04", "tests/fixtures/1_04_01"]
+    )
+    assert find_files(["tests/*"]) == find_files(["tests/fixtures"])
+    assert find_files(["tests/test_cli.py"]) == ["tests/test_cli.py"]
+
+
+def test_broken_pipe() -> None:
+    process = subprocess.Popen(
+        [sys.executable, "-m", "sierraecg", "dump", "tests/fixtures", "-j", "1"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    assert process.stdout is not None and process.stderr is not None
+    process.stdout.readline()
+    process.stdout.close()
+
+    errors = process.stderr.read()
+    process.stderr.close()
+    assert process.wait() == 1
+    assert errors == b""
@@ -0,0 +1,77 @@
+from typing import List
+
+import numpy as np
+import pytest
+
+from sierraecg.lzw import LzwDecoder, LzwEncoder
+from sierraecg.xli import XliDecoder, xli_decode, xli_encode
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"",
+        b"A",
+        b"ABABABA",
+        b"TOBEORNOTTOBEORTOBEORNOT",
+        bytes(range(256)) * 8,
+    ],
+)
+def test_lzw_round_trip(data: bytes) -> None:
+    decoder = LzwDecoder(LzwEncoder(bits=10).encode(data), bits=10)
+    assert bytes(decoder.read_bytes(len(data))) == data
+    assert decoder.read() == -1
+
+
+def test_lzw_reset_reuses_string_table() -> None:
+    inputs = [b"TOBEORNOTTOBEORTOBEORNOT", bytes(range(256)) * 8, b"ABABABA", b""]
+    decoder = LzwDecoder(b"", bits=10)
+    output = bytearray()
+    for data in inputs:
+        decoder.reset(LzwEncoder(bits=10).encode(data))
+        end = decoder.read_into(output)
+        assert bytes(output[:end]) == data
+
+    for data in inputs:
+        decoder.reset(LzwEncoder(bits=10).encode(data))
+        assert bytes(decoder.read_bytes(len(data))) == data
+        assert decoder.read() == -1
+
+
+@pytest.mark.parametrize(
+    "leads",
+    [
+        [[0, 0, 0, 0]],
+        [[5, -7], [1, 2, 3]],
+        [[-12, 78, 90, -33, -51, 84, 14, 3, -24, -20, -13, -21], [100, -100, 100, -100]],
+    ],
+)
+def test_xli_round_trip(leads: List[List[int]]) -> None:
+    samples = [np.array(lead, dtype=np.int16) for lead in leads]
+    decoded = xli_decode(xli_encode(samples), [])
+    assert len(decoded) == len(samples)
+    for expected, actual in zip(samples, decoded):
+        assert list(actual[: len(expected)]) == list(expected)
+
+
+def test_xli_round_trip_long_lead() -> None:
+    rng = np.random.default_rng(0)
+    samples = [np.cumsum(rng.integers(-20, 21, 5500)).astype(np.int16) for _ in range(2)]
+    decoded = xli_decode(xli_encode(samples), [])
+    for expected, actual in zip(samples, decoded):
+        assert np.array_equal(actual, expected)
+
+
+def test_xli_decoder_reuse() -> None:
+    rng = np.random.default_rng(1)
+    decoder = XliDecoder()
+    for count in [5500, 10, 2750, 5500]:
+        samples = [np.cumsum(rng.integers(-20, 21, count)).astype(np.int16) for _ in range(12)]
+        decoded = decoder.decode(xli_encode(samples))
+        for expected, actual in zip(samples, decoded):
+            assert np.array_equal(actual, expected)
+
+
+def test_xli_encode_rejects_unrepresentable_deltas() -> None:
+    with pytest.raises(ValueError):
+        xli_encode([np.array([0, 32767, -32768, 32767, 0], dtype=np.int16)])
@@ -1,8 +1,12 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
 from typing import List, Optional
 
+from defusedxml import minidom
 import pytest
 
-from sierraecg import UnsupportedXmlFileError, read_file
+from sierraecg import SierraEcgFile, SierraReader, UnsupportedXmlFileError, read_file
+from sierraecg.lib import get_root, read_header
 
 
 @pytest.mark.parametrize(
@@ -33,6 +37,30 @@ def test_assert_version(filename: str, expected_message: str) -> None:
         assert str(e_info.value) == expected_message
 
 
+@pytest.mark.parametrize(
+    "filename, expected_doc_ver, expected_compression, expected_repbeats",
+    [
+        ("tests/fixtures/1_03/129DYPRG.XML", "1.03", "XLI", False),
+        ("tests/fixtures/1_03/repbeats_example.xml", "1.03", "XLI", True),
+        ("tests/fixtures/1_04/3191723_ZZDEMOPTONLY_1-04_orig.xml", "1.04", "XLI", True),
+        ("tests/fixtures/1_04_01/2020-5-18_15-48-11.xml", "1.04.01", "XLI", True),
+    ],
+)
+def test_read_header(
+    filename: str, expected_doc_ver: str, expected_compression: str, expected_repbeats: bool
+) -> None:
+    header = read_header(get_root(minidom.parse(filename), "restingecgdata"))
+    assert header.doc_ver == expected_doc_ver
+    assert header.sampling_freq == 500
+    assert header.duration == 11000
+    assert header.labels[:3] == ["I", "II", "III"]
+    assert len(header.labels) == 12
+    assert header.encoding == "Base64"
+    assert header.compression == expected_compression
+    assert len(header.waveform_text) > 0
+    assert (header.repbeats is not None) == expected_repbeats
+
+
 @pytest.mark.parametrize(
     "filename, expected_leads, expected_midpoints",
     [
@@ -166,3 +194,53 @@ def test_no_repbeats() -> None:
 
     f = read_file("tests/fixtures/1_04_01/2020-5-18_15-48-11.xml", include_repbeats=False)
     assert len(f.repbeats) == 0
+
+
+FIXTURES = [
+    "tests/fixtures/1_03/129DYPRG.XML",
+    "tests/fixtures/1_03/repbeats_example.xml",
+    "tests/fixtures/1_04/3191723_ZZDEMOPTONLY_1-04_orig.xml",
+    "tests/fixtures/1_04/ad4d3d80-d165_1-04_orig.xml",
+    "tests/fixtures/1_04_01/2020-5-18_15-48-11.xml",
+]
+
+
+def assert_same_file(expected: SierraEcgFile, actual: SierraEcgFile) -> None:
+    assert actual.doc_type == expected.doc_type
+    assert actual.doc_ver == expected.doc_ver
+    assert [lead.label for lead in actual.leads] == [lead.label for lead in expected.leads]
+    for expected_lead, actual_lead in zip(expected.leads, actual.leads):
+        assert list(actual_lead.samples) == list(expected_lead.samples)
+    assert list(actual.repbeats) == list(expected.repbeats)
+    for label, repbeat in expected.repbeats.items():
+        assert list(actual.repbeats[label].samples) == list(repbeat.samples)
+
+
+def test_sierra_reader_reuse() -> None:
+    expected = [read_file(filename, include_repbeats=True) for filename in FIXTURES]
+
+    reader = SierraReader()
+    first = [reader.read_file(filename, include_repbeats=True) for filename in FIXTURES]
+    second = [reader.read_file(filename, include_repbeats=True) for filename in FIXTURES[::-1]]
+
+    # Files read earlier must not be changed by reading later ones
+    for e, f, s in zip(expected, first, second[::-1]):
+        assert_same_file(e, f)
+        assert_same_file(e, s)
+
+
+def test_sierra_reader_per_thread() -> None:
+    expected = [read_file(filename) for filename in FIXTURES]
+    local = threading.local()
+
+    def read(filename: str) -> SierraEcgFile:
+        if not hasattr(local, "reader"):
+            local.reader = SierraReader()
+        reader: SierraReader = local.reader
+        return reader.read_file(filename)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        actual = list(executor.map(read, FIXTURES * 4))
+
+    for index, f in enumerate(actual):
+        assert_same_file(expected[index % len(FIXTURES)], f)